@@ -1,38 +1,210 @@
 """API routes for resume upload and processing"""
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from backend.models.resume import ResumeUploadResponse
 from backend.models.job import JobPostingRequest, JobCaptureResponse
 from backend.models.generation import GenerateRequest, GenerateResponse
 from backend.services.pdf_parser import PDFParserService
-from backend.services.gemini_service import GeminiResumeParser
+from backend.services.gemini_service import GeminiResumeParser, RESUME_PROMPT_VERSION
+from backend.services import llm_cache
+from backend.config import settings
 from backend.services.latex_generator import LaTeXGeneratorService
 from backend.services.pdf_compiler import PDFCompilerService
-from backend.utils.workspace import ensure_workspace_exists, get_resume_path, create_job_folder, get_jobs_dir
+from backend.services.llm_limiter import call_llm
+from backend.utils.workspace import (
+    ensure_workspace_exists,
+    get_resume_path,
+    create_job_folder,
+    get_jobs_dir,
+    get_cache_dir,
+    get_raw_text_path,
+    find_job_by_fingerprint,
+    write_job_fingerprint,
+)
 from pathlib import Path
+from functools import lru_cache
+import asyncio
 import tempfile
+import hashlib
 import logging
-import json
+import shutil
+import anyio
 import magic
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Upload limits
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for multipart boundaries and form fields
+PDF_SIGNATURE = b"%PDF-"
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def _copy_parse(src_path: Path, dst_path: Path) -> None:
+    """
+    Copies a saved parse: the JSON file and its raw text sidecar.
+
+    Args:
+        src_path: Path to the source JSON file
+        dst_path: Path to the destination JSON file
+    """
+    shutil.copyfile(src_path, dst_path)
+
+    src_text_path = get_raw_text_path(src_path)
+    dst_text_path = get_raw_text_path(dst_path)
+    if src_text_path.exists():
+        shutil.copyfile(src_text_path, dst_text_path)
+    else:
+        dst_text_path.unlink(missing_ok=True)
+
+
+def _resume_cache_path(content_hash: str, gemini_parser: GeminiResumeParser) -> Path:
+    """
+    Returns the path of the cached parse for an uploaded PDF.
+
+    A hit skips both PDF text extraction and Gemini, so the key covers
+    everything that shapes the parse, not just the PDF bytes: the prompt
+    version tag, the extraction model and the PDF parser mode. Changing any
+    of them misses the cache instead of serving a stale parse.
+
+    Args:
+        content_hash: Hash of the uploaded PDF bytes
+        gemini_parser: The parser whose model produces the parse
+
+    Returns:
+        Path: Path to the cached resume JSON (which may not exist yet)
+    """
+    cache_key = llm_cache.make_key(
+        RESUME_PROMPT_VERSION,
+        gemini_parser.llm.model,
+        settings.pdf_parser_mode.lower(),
+        content_hash,
+    )
+    return get_cache_dir() / f"resume_{cache_key}.json"
+
+
+@lru_cache(maxsize=None)
+def get_resume_parser() -> GeminiResumeParser:
+    """
+    Returns the shared GeminiResumeParser instance.
+
+    The parser holds the Gemini client, so it is created once per process
+    and reused across requests instead of being rebuilt on every call.
+    Route handlers receive it via Depends(get_resume_parser).
+
+    Returns:
+        GeminiResumeParser: The process-wide parser instance
+    """
+    return GeminiResumeParser()
+
+
+@lru_cache(maxsize=None)
+def get_latex_generator() -> LaTeXGeneratorService:
+    """
+    Returns the shared LaTeXGeneratorService instance.
+
+    Kept separate from the parser because it uses a different model and
+    temperature. Route handlers receive it via Depends(get_latex_generator).
+
+    Returns:
+        LaTeXGeneratorService: The process-wide generator instance
+    """
+    return LaTeXGeneratorService()
+
+
+async def _save_upload_to_tempfile(file: UploadFile) -> tuple[Path, str]:
+    """
+    Streams an uploaded PDF to a temporary file in fixed-size chunks.
+
+    The size limit is enforced incrementally and the MIME type is checked on
+    the first chunk, so the full upload is never held in memory. The content
+    hash is computed over the same chunks as they are written, so the file
+    never has to be read back from disk (e.g. via hashlib.file_digest) to
+    key the parse cache.
+
+    Args:
+        file: The uploaded PDF file
+
+    Returns:
+        tuple[Path, str]: (Path to the temporary PDF file, content hash).
+            The caller is responsible for cleaning up the file.
+
+    Raises:
+        HTTPException: If the file is too large or is not a PDF
+    """
+    total_size = 0
+    hasher = hashlib.blake2b(digest_size=16)
+
+    async with anyio.wrap_file(
+        tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+    ) as tmp_file:
+        tmp_path = Path(tmp_file.wrapped.name)
+
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                # Validate PDF signature and MIME type on the first chunk (security check)
+                if total_size == 0:
+                    if not chunk.startswith(PDF_SIGNATURE):
+                        logger.warning(f"Missing PDF signature for file: {file.filename}")
+                        raise HTTPException(
+                            status_code=400,
+                            detail="Invalid file type. Only PDF files are allowed."
+                        )
+
+                    mime = magic.from_buffer(chunk, mime=True)
+                    if mime != 'application/pdf':
+                        logger.warning(f"Invalid MIME type detected: {mime} for file: {file.filename}")
+                        raise HTTPException(
+                            status_code=400,
+                            detail="Invalid file type. Only PDF files are allowed."
+                        )
+                    logger.info(f"MIME type validated: {mime}")
+
+                # Validate file size (max 10MB)
+                total_size += len(chunk)
+                if total_size > MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=400, detail="File size must be less than 10MB"
+                    )
+
+                hasher.update(chunk)
+                await tmp_file.write(chunk)
+
+            if total_size == 0:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+        except BaseException:
+            await tmp_file.aclose()
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    return tmp_path, hasher.hexdigest()
+
 
 @router.post("/resume", response_model=ResumeUploadResponse)
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(
+    file: UploadFile = File(...),
+    force_refresh: bool = Form(False),
+    gemini_parser: GeminiResumeParser = Depends(get_resume_parser),
+):
     """
     Upload and parse resume PDF.
 
     Steps:
     1. Validate file is PDF
-    2. Save to temporary location
-    3. Parse PDF using PyMuPDF4LLMLoader
-    4. Extract structured data using Gemini
-    5. Save to workspace/resume.json
-    6. Return success response
+    2. Stream to temporary location
+    3. Reuse the cached parse if this exact PDF was parsed before
+    4. Otherwise extract the PDF text with PyMuPDF
+    5. Extract structured data using Gemini
+    6. Save to workspace/resume.json
+    7. Return success response
 
     Args:
         file: The uploaded PDF file
+        force_refresh: If True, ignore any cached parse and call Gemini again
+        gemini_parser: Shared Gemini parser (injected)
 
     Returns:
         ResumeUploadResponse with success status and resume path
@@ -47,44 +219,39 @@ async def upload_resume(file: UploadFile = File(...)):
 
         logger.info(f"Received resume upload: {file.filename}")
 
-        # Read file content
-        content = await file.read()
-
-        # Validate file size (max 10MB)
-        if len(content) > 10 * 1024 * 1024:
-            raise HTTPException(
-                status_code=400, detail="File size must be less than 10MB"
-            )
-
-        # Validate MIME type (security check)
-        mime = magic.from_buffer(content, mime=True)
-        if mime != 'application/pdf':
-            logger.warning(f"Invalid MIME type detected: {mime} for file: {file.filename}")
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid file type. Only PDF files are allowed."
-            )
-
-        logger.info(f"MIME type validated: {mime}")
-
         # Ensure workspace exists
         ensure_workspace_exists()
 
-        # Save uploaded file to temporary location
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(content)
-            tmp_path = Path(tmp_file.name)
+        # Stream uploaded file to temporary location (validates size and MIME type)
+        tmp_path, content_hash = await _save_upload_to_tempfile(file)
 
         try:
-            # Parse PDF using PyMuPDF4LLMLoader
+            output_path = get_resume_path()
+            cache_path = _resume_cache_path(content_hash, gemini_parser)
+
+            # Skip parsing entirely if this exact PDF was parsed before
+            if not force_refresh and cache_path.exists():
+                logger.info(f"Using cached resume parse: {cache_path.name}")
+                await run_in_threadpool(_copy_parse, cache_path, output_path)
+
+                return ResumeUploadResponse(
+                    success=True,
+                    message="Resume uploaded and parsed successfully",
+                    resume_path=str(output_path),
+                )
+
+            # Extract PDF text (plain text or Markdown, per settings.pdf_parser_mode)
             logger.info("Parsing PDF...")
-            resume_text = PDFParserService.load_pdf(tmp_path)
+            resume_pages = await run_in_threadpool(PDFParserService.load_pdf_pages, tmp_path)
 
             # Parse with Gemini
             logger.info("Extracting structured data with Gemini...")
-            gemini_parser = GeminiResumeParser()
-            output_path = get_resume_path()
-            resume_data = gemini_parser.parse_resume(resume_text, output_path)
+            resume_data = await gemini_parser.aparse_resume_pages(
+                resume_pages, output_path, not force_refresh
+            )
+
+            # Cache the parse for future uploads of the same PDF
+            await run_in_threadpool(_copy_parse, output_path, cache_path)
 
             logger.info("Resume processing completed successfully")
 
@@ -114,18 +281,25 @@ async def upload_resume(file: UploadFile = File(...)):
 
 
 @router.post("/job", response_model=JobCaptureResponse)
-async def capture_job(job_request: JobPostingRequest):
+async def capture_job(
+    job_request: JobPostingRequest,
+    gemini_parser: GeminiResumeParser = Depends(get_resume_parser),
+):
     """
     Capture and parse job posting.
 
     Steps:
+    0. Return the existing job_slug if this exact posting was captured before
+       (with force_refresh, re-parse into that existing folder instead)
     1. Extract structured data from job posting text using Gemini
+       (reusing the cached parse if this exact posting was parsed before)
     2. Create job-specific folder with sanitized slug
     3. Save to workspace/jobs/<slug>/job.json
     4. Return success response with job_slug
 
     Args:
         job_request: JobPostingRequest containing raw_text and url
+        gemini_parser: Shared Gemini parser (injected)
 
     Returns:
         JobCaptureResponse with success status and job_slug
@@ -146,30 +320,39 @@ async def capture_job(job_request: JobPostingRequest):
         # Ensure workspace exists
         ensure_workspace_exists()
 
-        # Parse job posting with Gemini (without saving yet)
-        logger.info("Extracting structured job data with Gemini...")
-        gemini_parser = GeminiResumeParser()
+        # Short-circuit duplicate captures (e.g. extension retries) of the same posting
+        fingerprint = hashlib.blake2b(
+            f"{job_request.url}\n{job_request.raw_text}".encode("utf-8"), digest_size=10
+        ).hexdigest()
 
+        existing_slug = await run_in_threadpool(find_job_by_fingerprint, fingerprint)
+        if existing_slug and not job_request.force_refresh:
+            logger.info(f"Job posting already captured: {existing_slug}")
+            return JobCaptureResponse(success=True, job_slug=existing_slug)
+
+        # Parse job posting with Gemini (without saving yet)
         # We need to parse first to get job_title and company for folder creation
-        # So we'll create a temporary path, parse, then move to final location
-        from backend.models.job import JobData
-        structured_llm = gemini_parser.llm.with_structured_output(
-            schema=JobData, method="json_mode"
+        logger.info("Extracting structured job data with Gemini...")
+        job_data = await gemini_parser.aextract_job_posting(
+            job_request.raw_text,
+            job_request.url,
+            not job_request.force_refresh,
         )
-        prompt = gemini_parser._build_job_parsing_prompt(job_request.raw_text, job_request.url)
-        job_data: JobData = structured_llm.invoke(prompt)
-
-        # Ensure raw_text and url are set
-        job_data.raw_text = job_request.raw_text
-        job_data.url = job_request.url
 
-        # Create job folder using extracted job_title and company
-        logger.info(f"Creating job folder for: {job_data.job_title} at {job_data.company}")
-        job_folder, job_slug = create_job_folder(job_data.job_title, job_data.company)
+        if existing_slug:
+            # Re-parse into the folder already holding this posting, so no two
+            # folders ever share a fingerprint
+            logger.info(f"Refreshing existing job folder: {existing_slug}")
+            job_folder, job_slug = get_jobs_dir() / existing_slug, existing_slug
+        else:
+            # Create job folder using extracted job_title and company
+            logger.info(f"Creating job folder for: {job_data.job_title} at {job_data.company}")
+            job_folder, job_slug = create_job_folder(job_data.job_title, job_data.company)
 
         # Save job.json to the created folder
         job_json_path = job_folder / "job.json"
-        gemini_parser._save_job_json(job_data, job_json_path)
+        await run_in_threadpool(gemini_parser._save_job_json, job_data, job_json_path)
+        await run_in_threadpool(write_job_fingerprint, job_folder, fingerprint)
 
         logger.info(f"Job posting captured successfully: {job_slug}")
 
@@ -195,19 +378,23 @@ async def capture_job(job_request: JobPostingRequest):
 
 
 @router.post("/generate", response_model=GenerateResponse)
-async def generate_documents(request: GenerateRequest):
+async def generate_documents(
+    request: GenerateRequest,
+    latex_generator: LaTeXGeneratorService = Depends(get_latex_generator),
+):
     """
     Generate tailored resume and cover letter for a specific job.
 
     Steps:
     1. Load resume.json and job.json
     2. Generate cover letter LaTeX using Gemini
-    3. Generate tailored resume LaTeX using Gemini
-    4. Compile both to PDFs using pdflatex
+    3. Generate tailored resume LaTeX using Gemini (concurrently with step 2)
+    4. Compile both to PDFs using pdflatex (concurrently)
     5. Return paths to generated PDFs
 
     Args:
         request: GenerateRequest containing job_slug
+        latex_generator: Shared LaTeX generator (injected)
 
     Returns:
         GenerateResponse with paths to generated PDFs
@@ -226,7 +413,7 @@ async def generate_documents(request: GenerateRequest):
                 detail=f"Job folder not found: {request.job_slug}"
             )
 
-        # Load resume.json
+        # Check resume.json and job.json exist
         resume_path = get_resume_path()
         if not resume_path.exists():
             raise HTTPException(
@@ -234,10 +421,6 @@ async def generate_documents(request: GenerateRequest):
                 detail="Resume not found. Please upload your resume first."
             )
 
-        with open(resume_path, "r", encoding="utf-8") as f:
-            resume_data = json.load(f)
-
-        # Load job.json
         job_json_path = job_folder / "job.json"
         if not job_json_path.exists():
             raise HTTPException(
@@ -245,47 +428,45 @@ async def generate_documents(request: GenerateRequest):
                 detail=f"Job data not found for: {request.job_slug}"
             )
 
-        with open(job_json_path, "r", encoding="utf-8") as f:
-            job_data = json.load(f)
-
-        # Initialize services
-        latex_generator = LaTeXGeneratorService()
-
-        # Generate cover letter LaTeX
-        logger.info("Generating cover letter...")
-        cover_letter_tex_path = job_folder / "cover_letter.tex"
-        latex_generator.generate_cover_letter(
-            resume_data, job_data, cover_letter_tex_path
+        # Load resume.json and job.json concurrently
+        resume_bytes, job_bytes = await asyncio.gather(
+            anyio.Path(resume_path).read_bytes(),
+            anyio.Path(job_json_path).read_bytes(),
         )
+        resume_data = orjson.loads(resume_bytes)
+        job_data = orjson.loads(job_bytes)
 
-        # Generate resume LaTeX
-        logger.info("Generating tailored resume...")
+        # Generate cover letter and tailored resume LaTeX concurrently
+        logger.info("Generating cover letter and tailored resume...")
+        cover_letter_tex_path = job_folder / "cover_letter.tex"
         resume_tex_path = job_folder / "resume.tex"
-        latex_generator.generate_resume(
-            resume_data, job_data, resume_tex_path
+        await asyncio.gather(
+            call_llm(
+                latex_generator.agenerate_cover_letter,
+                resume_data, job_data, cover_letter_tex_path
+            ),
+            call_llm(
+                latex_generator.agenerate_resume,
+                resume_data, job_data, resume_tex_path
+            ),
         )
 
-        # Check if pdflatex is installed
+        # Check if a LaTeX engine (tectonic or pdflatex) is installed
         if not PDFCompilerService.check_latex_installed():
-            logger.warning("pdflatex not installed - returning LaTeX files only")
+            logger.warning("No LaTeX engine installed - returning LaTeX files only")
             return GenerateResponse(
                 success=True,
                 status="latex_only",
                 cover_letter_pdf=None,
                 resume_pdf=None,
-                error="pdflatex not installed. LaTeX files generated but PDFs could not be compiled."
+                error="No LaTeX engine (tectonic or pdflatex) installed. LaTeX files generated but PDFs could not be compiled."
             )
 
-        # Compile cover letter to PDF
-        logger.info("Compiling cover letter to PDF...")
-        cover_letter_pdf_path = PDFCompilerService.compile_latex_to_pdf(
-            cover_letter_tex_path
-        )
-
-        # Compile resume to PDF
-        logger.info("Compiling resume to PDF...")
-        resume_pdf_path = PDFCompilerService.compile_latex_to_pdf(
-            resume_tex_path
+        # Compile cover letter and resume to PDF concurrently
+        logger.info("Compiling cover letter and resume to PDF...")
+        cover_letter_pdf_path, resume_pdf_path = await asyncio.gather(
+            PDFCompilerService.acompile_latex_to_pdf(cover_letter_tex_path),
+            PDFCompilerService.acompile_latex_to_pdf(resume_tex_path),
         )
 
         # Build relative paths for response
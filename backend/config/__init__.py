@@ -1,5 +1,6 @@
 """Configuration management using Pydantic Settings"""
 from pydantic_settings import BaseSettings
+from functools import cached_property
 from pathlib import Path
 
 
@@ -9,6 +10,22 @@ class Settings(BaseSettings):
     # API Keys
     google_api_key: str
 
+    # Gemini Models
+    gemini_extraction_model: str = "gemini-2.0-flash-lite"  # Resume/job parsing
+    gemini_generation_model: str = "gemini-2.0-flash"  # LaTeX document generation
+
+    # Gemini Rate Limiting
+    llm_max_concurrency: int = 4  # Max Gemini calls in flight at once
+    llm_requests_per_minute: int = 30  # Max Gemini calls started per minute
+    llm_max_retries: int = 3  # Retries on quota exhaustion (HTTP 429)
+
+    # Resume Parsing
+    resume_chunk_max_tokens: int = 6000  # Estimated input tokens per Gemini parse call
+    pdf_parser_mode: str = "text"  # "text" (fast plain text) or "markdown" (pymupdf4llm layout)
+
+    # PDF Compilation
+    latex_engine: str = "auto"  # "auto" (tectonic if installed), "tectonic" or "pdflatex"
+
     # Workspace Configuration
     workspace_dir: str = "~/JobAgentWorkspace"
 
@@ -23,14 +40,14 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-    @property
+    @cached_property
     def workspace_path(self) -> Path:
-        """Returns expanded workspace directory path"""
+        """Returns expanded workspace directory path (resolved once)"""
         return Path(self.workspace_dir).expanduser().resolve()
 
-    @property
+    @cached_property
     def origins_list(self) -> list[str]:
-        """Returns list of allowed origins for CORS"""
+        """Returns list of allowed origins for CORS (parsed once)"""
         return [origin.strip() for origin in self.allowed_origins.split(",")]
 
 
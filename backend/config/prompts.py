@@ -1,4 +1,5 @@
 """System prompts for document generation"""
+import orjson
 
 COVER_LETTER_SYSTEM_PROMPT = """You are a professional cover letter writer with expertise in crafting compelling, personalized cover letters that highlight relevant experience and skills.
 
@@ -59,10 +60,52 @@ OUTPUT:
 Return ONLY the complete LaTeX code, nothing else. The output should be ready to compile."""
 
 
+def _prune_empty(value):
+    """
+    Recursively removes None, empty strings, empty lists and empty dicts.
+
+    Args:
+        value: A JSON-compatible value
+
+    Returns:
+        The value with all empty entries removed
+    """
+    if isinstance(value, dict):
+        pruned = {k: _prune_empty(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned = [_prune_empty(v) for v in value]
+        return [v for v in pruned if v not in (None, "", [], {})]
+    return value
+
+
+def _compact_resume_json(resume_json: dict) -> str:
+    """
+    Serializes resume data compactly for inclusion in a prompt.
+
+    Drops raw_text (already represented by the structured fields) and empty
+    values, and omits indentation, since every whitespace character costs
+    input tokens. orjson emits compact UTF-8 JSON by default.
+
+    Args:
+        resume_json: The parsed resume data as dictionary
+
+    Returns:
+        str: Compact JSON string
+    """
+    compact = {k: v for k, v in resume_json.items() if k != "raw_text"}
+    return orjson.dumps(_prune_empty(compact)).decode("utf-8")
+
+
 def build_cover_letter_prompt(resume_json: dict, job_data: dict) -> str:
     """
     Constructs the complete prompt for cover letter generation.
 
+    The candidate's resume comes before the job-specific content, so the
+    system prompt plus resume form a prefix shared by every /generate call,
+    which Gemini's implicit context caching can reuse when the configured
+    model supports it (Gemini 2.5 and later).
+
     Args:
         resume_json: The parsed resume data as dictionary
         job_data: The job posting data as dictionary
@@ -70,12 +113,10 @@ def build_cover_letter_prompt(resume_json: dict, job_data: dict) -> str:
     Returns:
         str: The complete prompt for the LLM
     """
-    import json
-
     prompt = f"""Generate a professional cover letter in LaTeX format for the following job application.
 
 CANDIDATE'S RESUME:
-{json.dumps(resume_json, indent=2)}
+{_compact_resume_json(resume_json)}
 
 JOB POSTING:
 Company: {job_data.get('company', 'N/A')}
@@ -94,6 +135,9 @@ def build_resume_prompt(resume_json: dict, job_data: dict) -> str:
     """
     Constructs the complete prompt for resume generation.
 
+    Like build_cover_letter_prompt, keeps the shared resume prefix ahead of
+    the job-specific content.
+
     Args:
         resume_json: The parsed resume data as dictionary
         job_data: The job posting data as dictionary
@@ -101,12 +145,10 @@ def build_resume_prompt(resume_json: dict, job_data: dict) -> str:
     Returns:
         str: The complete prompt for the LLM
     """
-    import json
-
     prompt = f"""Generate a tailored resume in LaTeX format optimized for the following job posting.
 
 CANDIDATE'S RESUME:
-{json.dumps(resume_json, indent=2)}
+{_compact_resume_json(resume_json)}
 
 TARGET JOB POSTING:
 Company: {job_data.get('company', 'N/A')}
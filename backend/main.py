@@ -1,9 +1,17 @@
 """FastAPI application entry point"""
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.api.routes import router
+from backend.api.routes import (
+    router,
+    get_resume_parser,
+    get_latex_generator,
+    MAX_UPLOAD_SIZE,
+    MULTIPART_OVERHEAD,
+)
 from backend.config import settings
+from backend.services.pdf_compiler import PDFCompilerService
 from backend.utils.workspace import ensure_workspace_exists
 import logging
 
@@ -29,6 +37,18 @@ async def lifespan(app: FastAPI):
     logger.info(f"Workspace directory: {settings.workspace_path}")
     ensure_workspace_exists()
 
+    # Create the shared Gemini services up front so the first request
+    # doesn't pay for client construction
+    get_resume_parser()
+    get_latex_generator()
+
+    # Resolve the LaTeX engine once at startup
+    latex_engine = PDFCompilerService.get_latex_engine()
+    if latex_engine:
+        logger.info(f"LaTeX engine: {latex_engine}")
+    else:
+        logger.warning("No LaTeX engine found - /api/generate will return LaTeX files only")
+
     yield
 
     # Shutdown (if needed in the future)
@@ -40,9 +60,31 @@ app = FastAPI(
     title="JobAgent0 Resume Parser",
     description="Resume upload and parsing service",
     version="1.0.0",
+    default_response_class=ORJSONResponse,  # Serialize responses with orjson
     lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Reject resume uploads whose Content-Length exceeds the size limit.
+
+    Runs before the multipart body is read, so oversized uploads are refused
+    without being received. Registered before the CORS middleware so the
+    rejection still carries CORS headers.
+    """
+    if request.url.path == "/api/resume":
+        content_length = request.headers.get("content-length", "0")
+        if not content_length.isdigit() or int(content_length) > MAX_UPLOAD_SIZE + MULTIPART_OVERHEAD:
+            logger.warning(f"Rejected upload with Content-Length: {content_length}")
+            return ORJSONResponse(
+                status_code=400, content={"detail": "File size must be less than 10MB"}
+            )
+
+    return await call_next(request)
+
+
 # Configure CORS for Chrome Extension
 app.add_middleware(
     CORSMiddleware,
@@ -6,6 +6,7 @@ class JobPostingRequest(BaseModel):
     """Request model for job posting submission."""
     raw_text: str = Field(..., description="Full text content of the job posting")
     url: str = Field(..., description="URL of the job posting page")
+    force_refresh: bool = Field(False, description="Ignore any cached parse and call Gemini again")
 
 
 class JobData(BaseModel):
@@ -16,7 +17,11 @@ class JobData(BaseModel):
     job_description: str = Field(..., description="Full job description text")
     location: Optional[str] = Field(None, description="Job location")
     url: str = Field(..., description="URL of the job posting")
-    raw_text: str = Field(..., description="Original raw text from the job posting")
+    raw_text: str = Field(
+        default="",
+        description="Original raw text from the job posting",
+        exclude=True,  # Saved to a sidecar job.txt, not job.json
+    )
 
 
 class JobCaptureResponse(BaseModel):
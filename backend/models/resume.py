@@ -120,7 +120,9 @@ class ResumeData(BaseModel):
     additional_sections: dict = Field(
         default_factory=dict
     )  # For any other sections
-    raw_text: str = ""  # Preserve original text for reference
+    raw_text: str = Field(
+        default="", exclude=True
+    )  # Original text; saved to a sidecar resume.txt, not resume.json
 
 
 class ResumeUploadResponse(BaseModel):
@@ -3,33 +3,107 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from backend.models.resume import ResumeData
 from backend.models.job import JobData
 from backend.config import settings
+from backend.services import llm_cache
+from backend.services.llm_limiter import call_llm
+from backend.utils.merge import merge_resume
+from backend.utils.workspace import get_raw_text_path
 from pathlib import Path
-import json
+from typing import Optional
+from pydantic import BaseModel, TypeAdapter, ValidationError
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rough characters-per-token ratio used to size resume chunks
+CHARS_PER_TOKEN = 4
+
+# Prompt version tags for the parse cache; bump when a prompt changes
+RESUME_PROMPT_VERSION = "resume-v1"
+JOB_PROMPT_VERSION = "job-v1"
+
+# Serializers for saving parses; dump_json returns UTF-8 bytes directly
+RESUME_ADAPTER = TypeAdapter(ResumeData)
+JOB_ADAPTER = TypeAdapter(JobData)
+
+# Fields filled in from the inputs after parsing, so Gemini must not generate them
+INPUT_ONLY_FIELDS = ("raw_text",)
+
+
+def _response_schema(model: type[BaseModel]) -> dict:
+    """
+    Builds the JSON schema Gemini must follow for a parse result.
+
+    Input-only fields are removed: listing raw_text would invite Gemini to
+    echo the whole input back, wasting output tokens (and risking
+    truncation) on a value that is overwritten anyway.
+
+    Args:
+        model: Pydantic model class of the parse result
+
+    Returns:
+        dict: JSON schema without the input-only fields
+    """
+    schema = model.model_json_schema()
+    for field_name in INPUT_ONLY_FIELDS:
+        schema["properties"].pop(field_name, None)
+    if "required" in schema:
+        schema["required"] = [
+            name for name in schema["required"] if name not in INPUT_ONLY_FIELDS
+        ]
+    return schema
+
+
+# JSON schemas sent as Gemini's response schema, derived once at import
+# instead of by with_structured_output for every parser instance
+RESUME_SCHEMA = _response_schema(ResumeData)
+JOB_SCHEMA = _response_schema(JobData)
+
 
 class GeminiResumeParser:
     """Service for parsing resume text into structured JSON using Gemini"""
 
     def __init__(self):
-        """Initialize Gemini Flash 2.0 with structured output support"""
+        """Initialize the Gemini extraction model with structured output support"""
         self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
+            model=settings.gemini_extraction_model,
             google_api_key=settings.google_api_key,
             temperature=0,  # Deterministic output for data extraction
+            max_retries=1,  # Single attempt; call_llm owns retry and backoff
         )
 
-    def parse_resume(self, resume_text: str, output_path: Path) -> ResumeData:
+        # Build the structured output runnables once from the precomputed
+        # schemas. A dict schema makes LangChain return the parsed JSON as a
+        # dict, so it is validated into the model as the last step.
+        self._resume_llm = self.llm.with_structured_output(
+            schema=RESUME_SCHEMA, method="json_mode"  # Use Gemini's JSON mode
+        ) | ResumeData.model_validate
+        self._job_llm = self.llm.with_structured_output(
+            schema=JOB_SCHEMA, method="json_mode"
+        ) | JobData.model_validate
+
+    async def aparse_resume_pages(
+        self, pages: list[str], output_path: Path, use_cache: bool = True
+    ) -> ResumeData:
         """
-        Parse resume text into structured JSON using Gemini's structured output.
+        Parse resume pages into structured JSON using Gemini's structured output.
 
-        Uses response_schema to enforce ResumeData structure.
+        Long resumes (e.g. academic CVs) can produce more structured output
+        than Gemini returns in a single response, which silently truncates the
+        JSON. Pages are grouped into chunks whose estimated token count stays
+        under settings.resume_chunk_max_tokens; the chunks are parsed
+        concurrently with the Gemini client's ainvoke and the partial results
+        are merged. Results are cached on disk by (prompt version, model,
+        resume text), so parsing the same text again skips the Gemini call.
+        Cache and file I/O run via asyncio.to_thread.
+
+        Each chunk's Gemini request goes through call_llm, so callers must not
+        wrap this method in call_llm themselves.
 
         Args:
-            resume_text: Extracted text from PDF
+            pages: Extracted text for each PDF page, in order
             output_path: Path where resume.json should be saved
+            use_cache: If False, ignore any cached result and call Gemini again
 
         Returns:
             ResumeData object
@@ -37,26 +111,43 @@ class GeminiResumeParser:
         Raises:
             ValueError: If parsing fails
         """
-        try:
-            logger.info("Starting Gemini resume parsing...")
+        chunks = self._chunk_pages(pages)
+        resume_text = "\n\n".join(pages)
 
-            # Create structured output LLM using response_schema
-            structured_llm = self.llm.with_structured_output(
-                schema=ResumeData, method="json_mode"  # Use Gemini's JSON mode
-            )
-
-            # Construct prompt that emphasizes preservation of ALL information
-            prompt = self._build_parsing_prompt(resume_text)
-
-            # Invoke Gemini with structured output
-            logger.info("Calling Gemini API...")
-            resume_data: ResumeData = structured_llm.invoke(prompt)
+        try:
+            logger.info(f"Starting Gemini resume parsing ({len(chunks)} chunk(s))...")
+
+            cache_key = llm_cache.make_key(RESUME_PROMPT_VERSION, self.llm.model, resume_text)
+            resume_data = None
+            if use_cache:
+                resume_data = await asyncio.to_thread(
+                    self._load_cached, ResumeData, cache_key
+                )
+
+            if resume_data is None:
+                if len(chunks) <= 1:
+                    prompts = [self._build_parsing_prompt(resume_text)]
+                else:
+                    prompts = [
+                        self._build_parsing_prompt(chunk, part=i + 1, total_parts=len(chunks))
+                        for i, chunk in enumerate(chunks)
+                    ]
+
+                # Each chunk is a separate Gemini request, so each one takes its
+                # own rate limiter slot (and is retried on its own after a 429)
+                logger.info("Calling Gemini API...")
+                parts: list[ResumeData] = await asyncio.gather(
+                    *(call_llm(self._resume_llm.ainvoke, prompt) for prompt in prompts)
+                )
+
+                resume_data = parts[0] if len(parts) == 1 else merge_resume(parts)
+                await asyncio.to_thread(self._store_cached, cache_key, resume_data)
 
             # Add raw text to the data
             resume_data.raw_text = resume_text
 
             # Save to JSON file
-            self._save_resume_json(resume_data, output_path)
+            await asyncio.to_thread(self._save_resume_json, resume_data, output_path)
 
             logger.info(f"Successfully parsed resume and saved to {output_path}")
             return resume_data
@@ -65,16 +156,90 @@ class GeminiResumeParser:
             logger.error(f"Error parsing resume with Gemini: {str(e)}")
             raise ValueError(f"Failed to parse resume: {str(e)}")
 
-    def _build_parsing_prompt(self, resume_text: str) -> str:
+    @staticmethod
+    def _load_cached(schema: type[BaseModel], cache_key: str) -> Optional[BaseModel]:
+        """
+        Loads a cached Gemini parse result.
+
+        Args:
+            schema: Pydantic model class of the cached result
+            cache_key: Cache key from llm_cache.make_key()
+
+        Returns:
+            Optional[BaseModel]: The cached result, or None on a miss. An
+                entry that can't be read or no longer validates (e.g. after a
+                model change) is also treated as a miss.
+        """
+        cached_path = llm_cache.get(cache_key)
+        if cached_path is None:
+            return None
+
+        try:
+            return schema.model_validate_json(cached_path.read_bytes())
+        except (ValidationError, OSError) as e:
+            logger.warning(f"Ignoring unusable LLM cache entry {cache_key[:12]}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _store_cached(cache_key: str, data: BaseModel) -> None:
+        """
+        Stores a Gemini parse result in the cache.
+
+        Args:
+            cache_key: Cache key from llm_cache.make_key()
+            data: The parse result
+        """
+        llm_cache.put(cache_key, data.model_dump_json().encode("utf-8"))
+
+    def _chunk_pages(self, pages: list[str]) -> list[str]:
+        """
+        Groups consecutive pages into chunks under the token budget.
+
+        A single page larger than the budget becomes its own chunk.
+
+        Args:
+            pages: Extracted text for each PDF page, in order
+
+        Returns:
+            list[str]: Chunk texts, in page order
+        """
+        max_chars = settings.resume_chunk_max_tokens * CHARS_PER_TOKEN
+        chunks: list[str] = []
+        current: list[str] = []
+        current_chars = 0
+
+        for page in pages:
+            if current and current_chars + len(page) > max_chars:
+                chunks.append("\n\n".join(current))
+                current, current_chars = [], 0
+            current.append(page)
+            current_chars += len(page)
+
+        if current:
+            chunks.append("\n\n".join(current))
+
+        return chunks
+
+    def _build_parsing_prompt(
+        self, resume_text: str, part: int = 1, total_parts: int = 1
+    ) -> str:
         """
         Builds comprehensive prompt for Gemini to extract ALL resume information.
 
         Args:
             resume_text: The text extracted from the resume PDF
+            part: Index (1-based) of this chunk when the resume is split
+            total_parts: Total number of chunks the resume was split into
 
         Returns:
             str: The complete prompt for Gemini
         """
+        part_note = ""
+        if total_parts > 1:
+            part_note = f"""
+NOTE: This is part {part} of {total_parts} of a longer resume. Extract only the information that appears in this part. If contact information is not present in this part, use an empty string for full_name.
+"""
+
         prompt = f"""You are an expert resume parser. Extract ALL information from the following resume text into a structured JSON format.
 
 CRITICAL REQUIREMENTS:
@@ -88,7 +253,7 @@ CRITICAL REQUIREMENTS:
 8. Include certifications, publications, awards, languages, volunteer work
 9. Preserve any additional sections not covered by standard categories
 10. Maintain chronological order for experiences and education
-
+{part_note}
 RESUME TEXT:
 {resume_text}
 
@@ -100,6 +265,9 @@ Extract this resume into the structured format, ensuring NO information is lost.
         """
         Saves ResumeData to JSON file with proper formatting.
 
+        raw_text is excluded from the JSON and written to a sidecar .txt file
+        next to it, so the JSON loaded on every /generate call stays small.
+
         Args:
             resume_data: The parsed resume data
             output_path: Path where JSON should be saved
@@ -107,62 +275,46 @@ Extract this resume into the structured format, ensuring NO information is lost.
         Raises:
             Exception: If file cannot be written
         """
-        try:
-            # Convert to dict and save with indentation
-            resume_dict = resume_data.model_dump(mode="json")
+        self._save_parse_json(RESUME_ADAPTER, resume_data, output_path, "resume")
 
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(resume_dict, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"Resume JSON saved to: {output_path}")
-
-        except Exception as e:
-            logger.error(f"Error saving resume JSON: {str(e)}")
-            raise
-
-    def parse_job_posting(self, job_text: str, url: str, output_path: Path) -> JobData:
+    async def aextract_job_posting(
+        self, job_text: str, url: str, use_cache: bool = True
+    ) -> JobData:
         """
-        Parse job posting text into structured JSON using Gemini's structured output.
+        Extract structured job data from posting text without saving it.
+
+        Uses the Gemini client's ainvoke. Results are cached on disk by
+        (prompt version, model, url, posting text), so re-capturing the same
+        posting skips the Gemini call. The Gemini request goes through
+        call_llm, so callers must not wrap this method in call_llm themselves.
 
         Args:
             job_text: Extracted text from job posting page
             url: URL of the job posting
-            output_path: Path where job.json should be saved
+            use_cache: If False, ignore any cached result and call Gemini again
 
         Returns:
-            JobData object
-
-        Raises:
-            ValueError: If parsing fails
+            JobData object with raw_text and url set from the inputs
         """
-        try:
-            logger.info("Starting Gemini job posting parsing...")
-
-            # Create structured output LLM using response_schema
-            structured_llm = self.llm.with_structured_output(
-                schema=JobData, method="json_mode"
-            )
+        cache_key = llm_cache.make_key(JOB_PROMPT_VERSION, self.llm.model, url, job_text)
+        job_data = None
+        if use_cache:
+            job_data = await asyncio.to_thread(self._load_cached, JobData, cache_key)
 
+        if job_data is None:
             # Construct prompt for job extraction
             prompt = self._build_job_parsing_prompt(job_text, url)
 
             # Invoke Gemini with structured output
             logger.info("Calling Gemini API for job extraction...")
-            job_data: JobData = structured_llm.invoke(prompt)
+            job_data: JobData = await call_llm(self._job_llm.ainvoke, prompt)
+            await asyncio.to_thread(self._store_cached, cache_key, job_data)
 
-            # Ensure raw_text and url are set
-            job_data.raw_text = job_text
-            job_data.url = url
-
-            # Save to JSON file
-            self._save_job_json(job_data, output_path)
+        # Ensure raw_text and url are set
+        job_data.raw_text = job_text
+        job_data.url = url
 
-            logger.info(f"Successfully parsed job posting and saved to {output_path}")
-            return job_data
-
-        except Exception as e:
-            logger.error(f"Error parsing job posting with Gemini: {str(e)}")
-            raise ValueError(f"Failed to parse job posting: {str(e)}")
+        return job_data
 
     def _build_job_parsing_prompt(self, job_text: str, url: str) -> str:
         """
@@ -199,22 +351,47 @@ Extract this job posting into the structured format, ensuring the full job descr
         """
         Saves JobData to JSON file with proper formatting.
 
+        raw_text is excluded from the JSON and written to a sidecar .txt file
+        next to it.
+
         Args:
             job_data: The parsed job data
             output_path: Path where JSON should be saved
 
+        Raises:
+            Exception: If file cannot be written
+        """
+        self._save_parse_json(JOB_ADAPTER, job_data, output_path, "job")
+
+    @staticmethod
+    def _save_parse_json(
+        adapter: TypeAdapter,
+        data: ResumeData | JobData,
+        output_path: Path,
+        document_name: str
+    ) -> None:
+        """
+        Saves a parse result to JSON, with raw_text in a sidecar .txt file.
+
+        Shared implementation of _save_resume_json and _save_job_json.
+
+        Args:
+            adapter: TypeAdapter for the type of data
+            data: The parsed resume or job data
+            output_path: Path where JSON should be saved
+            document_name: Name of the document, used in logs
+
         Raises:
             Exception: If file cannot be written
         """
         try:
-            # Convert to dict and save with indentation
-            job_dict = job_data.model_dump(mode="json")
+            # Serialize in one pass with pydantic-core and write the bytes as-is
+            output_path.write_bytes(adapter.dump_json(data, indent=2, exclude_none=True))
 
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(job_dict, f, indent=2, ensure_ascii=False)
+            get_raw_text_path(output_path).write_text(data.raw_text, encoding="utf-8")
 
-            logger.info(f"Job JSON saved to: {output_path}")
+            logger.info(f"{document_name.capitalize()} JSON saved to: {output_path}")
 
         except Exception as e:
-            logger.error(f"Error saving job JSON: {str(e)}")
+            logger.error(f"Error saving {document_name} JSON: {str(e)}")
             raise
@@ -8,11 +8,25 @@ from backend.config.prompts import (
     build_resume_prompt
 )
 from pathlib import Path
+from typing import Callable
+import anyio
 import logging
 import json
+import re
 
 logger = logging.getLogger(__name__)
 
+# Single pattern checked by _validate_latex_code, compiled once at import.
+# Group 1 matches \input{ / \include{, group 2 captures the document class.
+LATEX_CHECK_PATTERN = re.compile(
+    r'\\(input|include)\{|\\documentclass(?:\[[^\]]*\])?\{([^}]+)\}'
+)
+
+# Document classes that ship with every LaTeX distribution
+STANDARD_DOCUMENT_CLASSES = frozenset(
+    {'article', 'report', 'book', 'letter', 'beamer', 'memoir'}
+)
+
 
 class LaTeXGeneratorService:
     """Service for generating LaTeX documents (cover letters and resumes) using Gemini"""
@@ -20,9 +34,10 @@ class LaTeXGeneratorService:
     def __init__(self):
         """Initialize Gemini model for LaTeX generation"""
         self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
+            model=settings.gemini_generation_model,
             google_api_key=settings.google_api_key,
             temperature=0.7,  # Slightly higher temperature for creative writing
+            max_retries=1,  # Single attempt; call_llm owns retry and backoff
         )
 
     def generate_cover_letter(
@@ -45,43 +60,87 @@ class LaTeXGeneratorService:
         Raises:
             ValueError: If generation fails
         """
-        try:
-            logger.info("Generating cover letter with Gemini...")
+        return self._generate(
+            "cover letter",
+            COVER_LETTER_SYSTEM_PROMPT,
+            build_cover_letter_prompt,
+            resume_data,
+            job_data,
+            output_path,
+        )
 
-            # Build the complete prompt
-            user_prompt = build_cover_letter_prompt(resume_data, job_data)
+    def generate_resume(
+        self,
+        resume_data: dict,
+        job_data: dict,
+        output_path: Path
+    ) -> str:
+        """
+        Generate a tailored resume in LaTeX format.
 
-            # Create messages with system prompt and user prompt
-            messages = [
-                {"role": "system", "content": COVER_LETTER_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ]
+        Args:
+            resume_data: The parsed resume data as dictionary
+            job_data: The job posting data as dictionary
+            output_path: Path where resume.tex should be saved
 
-            # Call Gemini
-            logger.info("Calling Gemini API for cover letter generation...")
-            response = self.llm.invoke(messages)
+        Returns:
+            str: The generated LaTeX code
 
-            # Extract LaTeX code from response
-            latex_code = self._extract_latex_code(response.content)
+        Raises:
+            ValueError: If generation fails
+        """
+        return self._generate(
+            "resume",
+            RESUME_SYSTEM_PROMPT,
+            build_resume_prompt,
+            resume_data,
+            job_data,
+            output_path,
+        )
 
-            # Save to file
-            self._save_latex_file(latex_code, output_path)
+    async def agenerate_cover_letter(
+        self,
+        resume_data: dict,
+        job_data: dict,
+        output_path: Path
+    ) -> str:
+        """
+        Generate a cover letter in LaTeX format, streaming it to disk.
 
-            logger.info(f"Cover letter LaTeX saved to: {output_path}")
-            return latex_code
+        Async counterpart of generate_cover_letter that writes response
+        chunks to output_path as Gemini produces them.
 
-        except Exception as e:
-            logger.error(f"Error generating cover letter: {str(e)}")
-            raise ValueError(f"Failed to generate cover letter: {str(e)}")
+        Args:
+            resume_data: The parsed resume data as dictionary
+            job_data: The job posting data as dictionary
+            output_path: Path where cover_letter.tex should be saved
 
-    def generate_resume(
+        Returns:
+            str: The generated LaTeX code
+
+        Raises:
+            ValueError: If generation fails
+        """
+        return await self._agenerate(
+            "cover letter",
+            COVER_LETTER_SYSTEM_PROMPT,
+            build_cover_letter_prompt,
+            resume_data,
+            job_data,
+            output_path,
+        )
+
+    async def agenerate_resume(
         self,
         resume_data: dict,
         job_data: dict,
         output_path: Path
     ) -> str:
         """
-        Generate a tailored resume in LaTeX format.
+        Generate a tailored resume in LaTeX format, streaming it to disk.
+
+        Async counterpart of generate_resume that writes response chunks to
+        output_path as Gemini produces them.
 
         Args:
             resume_data: The parsed resume data as dictionary
@@ -94,20 +153,50 @@ class LaTeXGeneratorService:
         Raises:
             ValueError: If generation fails
         """
-        try:
-            logger.info("Generating tailored resume with Gemini...")
+        return await self._agenerate(
+            "resume",
+            RESUME_SYSTEM_PROMPT,
+            build_resume_prompt,
+            resume_data,
+            job_data,
+            output_path,
+        )
+
+    def _generate(
+        self,
+        document_name: str,
+        system_prompt: str,
+        build_prompt: Callable[[dict, dict], str],
+        resume_data: dict,
+        job_data: dict,
+        output_path: Path
+    ) -> str:
+        """
+        Generates a LaTeX document with Gemini and saves it.
+
+        Shared implementation of generate_cover_letter and generate_resume.
+
+        Args:
+            document_name: Name of the document, used in logs and errors
+            system_prompt: System prompt for the document type
+            build_prompt: Builds the user prompt from resume and job data
+            resume_data: The parsed resume data as dictionary
+            job_data: The job posting data as dictionary
+            output_path: Path where the .tex file should be saved
 
-            # Build the complete prompt
-            user_prompt = build_resume_prompt(resume_data, job_data)
+        Returns:
+            str: The generated LaTeX code
 
-            # Create messages with system prompt and user prompt
-            messages = [
-                {"role": "system", "content": RESUME_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ]
+        Raises:
+            ValueError: If generation fails
+        """
+        try:
+            logger.info(f"Generating {document_name} with Gemini...")
+
+            messages = self._build_messages(system_prompt, build_prompt(resume_data, job_data))
 
             # Call Gemini
-            logger.info("Calling Gemini API for resume generation...")
+            logger.info(f"Calling Gemini API for {document_name} generation...")
             response = self.llm.invoke(messages)
 
             # Extract LaTeX code from response
@@ -116,12 +205,127 @@ class LaTeXGeneratorService:
             # Save to file
             self._save_latex_file(latex_code, output_path)
 
-            logger.info(f"Resume LaTeX saved to: {output_path}")
+            logger.info(f"{document_name.capitalize()} LaTeX saved to: {output_path}")
             return latex_code
 
         except Exception as e:
-            logger.error(f"Error generating resume: {str(e)}")
-            raise ValueError(f"Failed to generate resume: {str(e)}")
+            logger.error(f"Error generating {document_name}: {str(e)}")
+            raise ValueError(f"Failed to generate {document_name}: {str(e)}")
+
+    async def _agenerate(
+        self,
+        document_name: str,
+        system_prompt: str,
+        build_prompt: Callable[[dict, dict], str],
+        resume_data: dict,
+        job_data: dict,
+        output_path: Path
+    ) -> str:
+        """
+        Generates a LaTeX document with Gemini, streaming it to disk.
+
+        Shared implementation of agenerate_cover_letter and agenerate_resume.
+
+        Args:
+            document_name: Name of the document, used in logs and errors
+            system_prompt: System prompt for the document type
+            build_prompt: Builds the user prompt from resume and job data
+            resume_data: The parsed resume data as dictionary
+            job_data: The job posting data as dictionary
+            output_path: Path where the .tex file should be saved
+
+        Returns:
+            str: The generated LaTeX code
+
+        Raises:
+            ValueError: If generation fails
+        """
+        try:
+            logger.info(f"Generating {document_name} with Gemini (streaming)...")
+
+            messages = self._build_messages(system_prompt, build_prompt(resume_data, job_data))
+            latex_code = await self._astream_latex_to_file(messages, output_path)
+
+            logger.info(f"{document_name.capitalize()} LaTeX saved to: {output_path}")
+            return latex_code
+
+        except Exception as e:
+            logger.error(f"Error generating {document_name}: {str(e)}")
+            raise ValueError(f"Failed to generate {document_name}: {str(e)}")
+
+    @staticmethod
+    def _build_messages(system_prompt: str, user_prompt: str) -> list[dict]:
+        """
+        Creates the chat messages for a generation call.
+
+        Args:
+            system_prompt: System prompt for the document type
+            user_prompt: User prompt with the resume and job data
+
+        Returns:
+            list[dict]: System and user messages for the LLM
+        """
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    async def _astream_latex_to_file(self, messages: list[dict], output_path: Path) -> str:
+        """
+        Streams a Gemini response into a .tex file, then validates it.
+
+        Chunks are written as they arrive so disk I/O overlaps generation.
+        They go to a temporary .tex.part file next to output_path; once the
+        stream ends it is read back, markdown fences are stripped and the
+        code is validated, and only then is it renamed onto output_path. A
+        failed or interrupted generation therefore leaves any previous .tex
+        file untouched.
+
+        Args:
+            messages: System and user messages for the LLM
+            output_path: Path where the .tex file should be saved
+
+        Returns:
+            str: The extracted LaTeX code
+
+        Raises:
+            ValueError: If the generated LaTeX fails validation
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part_file = anyio.Path(output_path.with_suffix(".tex.part"))
+
+        try:
+            logger.info("Streaming Gemini API response to file...")
+            cached_tokens = 0
+            async with await anyio.open_file(part_file, "w", encoding="utf-8") as f:
+                async for chunk in self.llm.astream(messages):
+                    await f.write(chunk.content)
+                    if chunk.usage_metadata:
+                        token_details = chunk.usage_metadata.get("input_token_details", {})
+                        cached_tokens += token_details.get("cache_read", 0)
+
+            # Opportunistic: static prompt prefixes are served from Gemini's
+            # implicit cache only on models that support it (Gemini 2.5+); the
+            # default gemini-2.0-flash never reports cache hits
+            if cached_tokens:
+                logger.info(f"Gemini reused {cached_tokens} cached input tokens")
+
+            response_content = await part_file.read_text(encoding="utf-8")
+
+            # Extract (and validate) LaTeX code from response
+            latex_code = self._extract_latex_code(response_content)
+            if latex_code != response_content:
+                await part_file.write_text(latex_code, encoding="utf-8")
+
+            # Atomically replace the previous .tex file, if any
+            await part_file.replace(output_path)
+
+        except BaseException:
+            await part_file.unlink(missing_ok=True)
+            raise
+
+        logger.info(f"LaTeX file saved to: {output_path}")
+        return latex_code
 
     def _extract_latex_code(self, response_content: str) -> str:
         """
@@ -161,31 +365,34 @@ class LaTeXGeneratorService:
         Raises:
             ValueError: If critical issues are detected that would prevent compilation
         """
-        # Check for \input{} or \include{} commands
-        if "\\input{" in latex_code or "\\include{" in latex_code:
-            logger.warning(
-                "Generated LaTeX contains \\input{} or \\include{} commands. "
-                "This may cause compilation failures if referenced files don't exist."
-            )
-            raise ValueError(
-                "Generated LaTeX uses external file references (\\input or \\include). "
-                "The document must be self-contained for successful compilation."
-            )
-
-        # Check for custom document classes (non-standard)
-        import re
-        doc_class_match = re.search(r'\\documentclass(?:\[.*?\])?\{([^}]+)\}', latex_code)
-        if doc_class_match:
-            doc_class = doc_class_match.group(1)
-            standard_classes = ['article', 'report', 'book', 'letter', 'beamer', 'memoir']
-            if doc_class not in standard_classes:
+        # Walk the code once, checking for \input{} / \include{} commands and
+        # the (first) document class in the same pass
+        doc_class_checked = False
+        for match in LATEX_CHECK_PATTERN.finditer(latex_code):
+            if match.group(1):
+                logger.warning(
+                    "Generated LaTeX contains \\input{} or \\include{} commands. "
+                    "This may cause compilation failures if referenced files don't exist."
+                )
+                raise ValueError(
+                    "Generated LaTeX uses external file references (\\input or \\include). "
+                    "The document must be self-contained for successful compilation."
+                )
+
+            if doc_class_checked:
+                continue
+            doc_class_checked = True
+
+            # Check for custom document classes (non-standard)
+            doc_class = match.group(2)
+            if doc_class not in STANDARD_DOCUMENT_CLASSES:
                 logger.warning(
                     f"Generated LaTeX uses non-standard document class: {doc_class}. "
                     f"This may require external .cls files and cause compilation failures."
                 )
                 raise ValueError(
                     f"Generated LaTeX uses non-standard document class '{doc_class}'. "
-                    f"Only standard classes ({', '.join(standard_classes)}) are allowed."
+                    f"Only standard classes ({', '.join(sorted(STANDARD_DOCUMENT_CLASSES))}) are allowed."
                 )
 
     def _save_latex_file(self, latex_code: str, output_path: Path) -> None:
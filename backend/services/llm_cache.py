@@ -0,0 +1,89 @@
+"""Content-addressed disk cache for Gemini parse results"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from backend.utils.workspace import get_cache_dir
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Subdirectory of the workspace cache holding Gemini results
+LLM_CACHE_SUBDIR = "llm"
+
+
+def make_key(*parts: str) -> str:
+    """
+    Builds a cache key from the inputs that determine a Gemini result.
+
+    Callers pass a prompt version tag, the model name and the input text,
+    so changing any of them (e.g. bumping the tag after editing a prompt)
+    misses the cache instead of returning a stale result.
+
+    Args:
+        *parts: The strings that identify the request
+
+    Returns:
+        str: Hex SHA-256 digest of the joined parts
+    """
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _llm_cache_dir() -> Path:
+    """Returns the Gemini cache directory, creating it once per process."""
+    cache_dir = get_cache_dir() / LLM_CACHE_SUBDIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def _entry_path(key: str) -> Path:
+    """Returns the path of the cache entry for a key."""
+    return _llm_cache_dir() / f"{key}.json"
+
+
+def get(key: str) -> Optional[Path]:
+    """
+    Looks up a cached result.
+
+    Args:
+        key: Cache key from make_key()
+
+    Returns:
+        Optional[Path]: Path to the cached JSON, or None on a miss
+    """
+    path = _entry_path(key)
+    if path.exists():
+        logger.info(f"LLM cache hit: {key[:12]}")
+        return path
+    return None
+
+
+def put(key: str, data: bytes) -> Path:
+    """
+    Stores a result in the cache.
+
+    The entry is written to a temporary file and renamed into place, so a
+    concurrent reader never sees a partially written entry.
+
+    Args:
+        key: Cache key from make_key()
+        data: Serialized JSON to store
+
+    Returns:
+        Path: Path to the cache entry
+    """
+    path = _entry_path(key)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    return path
@@ -0,0 +1,144 @@
+"""Rate limiting and retry for Gemini API calls"""
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import Any, Callable
+from fastapi.concurrency import run_in_threadpool
+from google.api_core.exceptions import ResourceExhausted
+from backend.config import settings
+import asyncio
+import inspect
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Length of the sliding rate-limit window in seconds
+RATE_WINDOW_SECONDS = 60.0
+
+
+class LLMRateLimiter:
+    """
+    Limits concurrent and per-minute Gemini calls across all requests.
+
+    Combines an asyncio.Semaphore (max in-flight calls) with a sliding-window
+    counter (max calls started per minute) so bursts of /resume, /job and
+    /generate requests queue up instead of tripping the project quota.
+    """
+
+    def __init__(self, max_concurrency: int, requests_per_minute: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of Gemini calls in flight at once
+            requests_per_minute: Maximum number of Gemini calls started per minute
+        """
+        self.requests_per_minute = requests_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._window_lock = asyncio.Lock()
+        self._call_times: deque[float] = deque()
+
+    async def _wait_for_window_slot(self) -> None:
+        """Wait until starting another call stays within the per-minute limit."""
+        async with self._window_lock:
+            while True:
+                now = time.monotonic()
+
+                # Drop calls that have left the window
+                while self._call_times and now - self._call_times[0] >= RATE_WINDOW_SECONDS:
+                    self._call_times.popleft()
+
+                if len(self._call_times) < self.requests_per_minute:
+                    self._call_times.append(now)
+                    return
+
+                wait_time = RATE_WINDOW_SECONDS - (now - self._call_times[0])
+                logger.info(f"Gemini rate limit reached, waiting {wait_time:.1f}s")
+                await asyncio.sleep(wait_time)
+
+    @asynccontextmanager
+    async def gate(self):
+        """
+        Async context manager that holds a rate-limited Gemini call slot.
+
+        Usage:
+            async with limiter.gate():
+                ...
+        """
+        async with self._semaphore:
+            await self._wait_for_window_slot()
+            yield
+
+
+def _is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Check whether an error (or anything in its cause chain) is a Gemini 429.
+
+    Services wrap API errors in ValueError, so the original ResourceExhausted
+    is looked up through __cause__ / __context__.
+    """
+    seen = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen:
+        if isinstance(current, ResourceExhausted):
+            return True
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return False
+
+
+# Global limiter shared by all routes
+llm_limiter = LLMRateLimiter(
+    max_concurrency=settings.llm_max_concurrency,
+    requests_per_minute=settings.llm_requests_per_minute,
+)
+
+
+def llm_gate():
+    """
+    Returns the shared rate-limited Gemini call slot.
+
+    Usage:
+        async with llm_gate():
+            ...
+    """
+    return llm_limiter.gate()
+
+
+async def call_llm(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a Gemini-backed call under the rate limiter.
+
+    Coroutine functions are awaited directly; blocking functions are run in
+    the threadpool.
+
+    Retries with jittered exponential backoff when Gemini reports that the
+    quota is exhausted (HTTP 429). The call slot is released while backing off.
+
+    Args:
+        func: The function (sync or async) that calls Gemini
+        *args: Positional arguments for func
+
+    Returns:
+        The return value of func
+
+    Raises:
+        Exception: Whatever func raises once retries are exhausted
+    """
+    for attempt in range(settings.llm_max_retries + 1):
+        try:
+            async with llm_gate():
+                if inspect.iscoroutinefunction(func):
+                    return await func(*args)
+                return await run_in_threadpool(func, *args)
+        except Exception as e:
+            if attempt >= settings.llm_max_retries or not _is_rate_limit_error(e):
+                raise
+
+            delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+            logger.warning(
+                f"Gemini quota exhausted, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{settings.llm_max_retries})"
+            )
+            await asyncio.sleep(delay)
@@ -1,29 +1,99 @@
 """Service for compiling LaTeX documents to PDF"""
 import subprocess
+import tempfile
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Optional
+from backend.config import settings
+import asyncio
 import logging
+import os
+import re
 import shutil
 
 logger = logging.getLogger(__name__)
 
+# Supported LaTeX engines, in "auto" preference order
+LATEX_ENGINES = ("tectonic", "pdflatex")
+
+# RAM-backed tmpfs for build directories, if available (falls back to the system temp dir)
+BUILD_DIR_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Maximum time for a single LaTeX engine run
+COMPILE_TIMEOUT_SECONDS = 60
+
+# Commands whose output depends on the .aux file from a previous pass
+CROSS_REFERENCE_MARKERS = (
+    "\\ref{",
+    "\\pageref{",
+    "\\eqref{",
+    "\\cite{",
+    "\\tableofcontents",
+    "\\listoffigures",
+    "\\listoftables",
+)
+
+
+# \begin{...} / \end{...} commands, for the pre-flight balance check
+ENVIRONMENT_PATTERN = re.compile(r'\\(begin|end)\{([^}]+)\}')
+
+# LaTeX comments: a % preceded by an even number of backslashes (so \% is a
+# literal percent sign but \\% is a line break followed by a comment). Group 1
+# keeps the backslashes when the comment is stripped.
+COMMENT_PATTERN = re.compile(r'(?<!\\)((?:\\\\)*)%.*')
+
+# Verbatim environments and \verb, whose contents are not parsed as LaTeX
+VERBATIM_PATTERN = re.compile(
+    r'\\begin\{(verbatim\*?|Verbatim|lstlisting|minted)\}.*?\\end\{\1\}'
+    r'|\\verb\*?([^a-zA-Z\s*]).*?\2',
+    re.DOTALL,
+)
+
 
 class PDFCompilerService:
-    """Service for compiling LaTeX files to PDF using pdflatex"""
+    """Service for compiling LaTeX files to PDF using tectonic or pdflatex"""
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def get_latex_engine() -> Optional[str]:
+        """
+        Resolve which LaTeX engine to use, based on settings.latex_engine.
+
+        In "auto" mode tectonic is preferred: it loads a prebuilt format from
+        its cache and reruns itself until references settle inside a single
+        process, instead of paying TeX startup on every pdflatex pass.
+        The result is cached for the lifetime of the process.
+
+        Returns:
+            Optional[str]: "tectonic" or "pdflatex", or None if the
+            configured engine is not installed
+        """
+        engine = settings.latex_engine.lower()
+        candidates = LATEX_ENGINES if engine == "auto" else (engine,)
+
+        for candidate in candidates:
+            if candidate in LATEX_ENGINES and shutil.which(candidate) is not None:
+                return candidate
+        return None
 
     @staticmethod
     def check_latex_installed() -> bool:
         """
-        Check if pdflatex is installed on the system.
+        Check if a LaTeX engine is installed on the system.
 
         Returns:
-            bool: True if pdflatex is available, False otherwise
+            bool: True if tectonic or pdflatex is available, False otherwise
         """
-        return shutil.which("pdflatex") is not None
+        return PDFCompilerService.get_latex_engine() is not None
 
     @staticmethod
     def compile_latex_to_pdf(tex_file_path: Path) -> Path:
         """
-        Compile a LaTeX file to PDF using pdflatex.
+        Compile a LaTeX file to PDF using the configured LaTeX engine.
+
+        The engine runs in a throwaway build directory (on tmpfs where
+        available), so .aux/.log files never touch the workspace; only the
+        finished PDF is moved next to the .tex file.
 
         Args:
             tex_file_path: Path to the .tex file
@@ -32,95 +102,456 @@ class PDFCompilerService:
             Path: Path to the generated PDF file
 
         Raises:
-            ValueError: If compilation fails or pdflatex is not installed
+            ValueError: If compilation fails or no LaTeX engine is installed
+        """
+        engine = PDFCompilerService._require_engine(tex_file_path)
+        pdf_path = tex_file_path.with_suffix(".pdf")
+
+        tex_content = tex_file_path.read_text(encoding="utf-8", errors="replace")
+        PDFCompilerService._preflight_latex(tex_content)
+
+        build_dir = None
+        try:
+            build_tex_path = PDFCompilerService._prepare_build_dir(tex_file_path)
+            build_dir = build_tex_path.parent
+
+            logger.info(f"Compiling LaTeX file with {engine}: {tex_file_path}")
+            for command, check_result in PDFCompilerService._compile_steps(
+                engine, build_tex_path, tex_content
+            ):
+                result = subprocess.run(
+                    command,
+                    cwd=build_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=COMPILE_TIMEOUT_SECONDS
+                )
+                check_result(result)
+
+            shutil.move(build_tex_path.with_suffix(".pdf"), pdf_path)
+
+        except subprocess.TimeoutExpired:
+            logger.error(f"{engine} compilation timed out")
+            raise ValueError(f"PDF compilation timed out after {COMPILE_TIMEOUT_SECONDS} seconds")
+
+        except ValueError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error compiling LaTeX to PDF: {str(e)}")
+            raise ValueError(f"Failed to compile PDF: {str(e)}")
+
+        finally:
+            if build_dir is not None:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+        logger.info(f"Successfully compiled PDF: {pdf_path}")
+        return pdf_path
+
+    @staticmethod
+    async def acompile_latex_to_pdf(tex_file_path: Path) -> Path:
+        """
+        Async version of compile_latex_to_pdf.
+
+        Runs the engine with asyncio.create_subprocess_exec, so concurrent
+        compiles don't each hold a threadpool worker while TeX runs. Falls
+        back to compile_latex_to_pdf in a worker thread on event loops that
+        don't support subprocesses (e.g. the Windows selector loop).
+
+        Args:
+            tex_file_path: Path to the .tex file
+
+        Returns:
+            Path: Path to the generated PDF file
+
+        Raises:
+            ValueError: If compilation fails or no LaTeX engine is installed
+        """
+        engine = PDFCompilerService._require_engine(tex_file_path)
+        pdf_path = tex_file_path.with_suffix(".pdf")
+
+        tex_content = await asyncio.to_thread(
+            tex_file_path.read_text, encoding="utf-8", errors="replace"
+        )
+        PDFCompilerService._preflight_latex(tex_content)
+
+        # File handling runs in worker threads (the final move copies the PDF
+        # from tmpfs to the workspace disk); only the engine runs on the loop
+        build_dir = None
+        try:
+            build_tex_path = await asyncio.to_thread(
+                PDFCompilerService._prepare_build_dir, tex_file_path
+            )
+            build_dir = build_tex_path.parent
+
+            logger.info(f"Compiling LaTeX file with {engine}: {tex_file_path}")
+            for command, check_result in PDFCompilerService._compile_steps(
+                engine, build_tex_path, tex_content
+            ):
+                result = await PDFCompilerService._arun(command, str(build_dir))
+                check_result(result)
+
+            await asyncio.to_thread(shutil.move, build_tex_path.with_suffix(".pdf"), pdf_path)
+
+        except NotImplementedError:
+            return await asyncio.to_thread(PDFCompilerService.compile_latex_to_pdf, tex_file_path)
+
+        except asyncio.TimeoutError:
+            logger.error(f"{engine} compilation timed out")
+            raise ValueError(f"PDF compilation timed out after {COMPILE_TIMEOUT_SECONDS} seconds")
+
+        except ValueError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error compiling LaTeX to PDF: {str(e)}")
+            raise ValueError(f"Failed to compile PDF: {str(e)}")
+
+        finally:
+            if build_dir is not None:
+                await asyncio.to_thread(shutil.rmtree, build_dir, ignore_errors=True)
+
+        logger.info(f"Successfully compiled PDF: {pdf_path}")
+        return pdf_path
+
+    @staticmethod
+    def _prepare_build_dir(tex_file_path: Path) -> Path:
+        """
+        Creates a throwaway build directory holding a copy of the .tex file.
+
+        The directory is created under BUILD_DIR_ROOT (tmpfs where available);
+        the caller is responsible for removing it.
+
+        Args:
+            tex_file_path: Path to the .tex file
+
+        Returns:
+            Path: Path to the copy of the .tex file in the build directory
+        """
+        build_dir = Path(tempfile.mkdtemp(dir=BUILD_DIR_ROOT, prefix="jobagent-"))
+        build_tex_path = build_dir / tex_file_path.name
+        shutil.copyfile(tex_file_path, build_tex_path)
+        return build_tex_path
+
+    @staticmethod
+    def _require_engine(tex_file_path: Path) -> str:
+        """
+        Returns the LaTeX engine to use, after checking the inputs exist.
+
+        Args:
+            tex_file_path: Path to the .tex file
+
+        Returns:
+            str: The LaTeX engine name
+
+        Raises:
+            ValueError: If no LaTeX engine is installed or the file is missing
         """
-        if not PDFCompilerService.check_latex_installed():
+        engine = PDFCompilerService.get_latex_engine()
+        if engine is None:
             raise ValueError(
-                "pdflatex is not installed. Please install TeX Live or MiKTeX to compile LaTeX documents."
+                "No LaTeX engine (tectonic or pdflatex) installed. Please install tectonic, TeX Live or MiKTeX to compile LaTeX documents."
             )
 
         if not tex_file_path.exists():
             raise ValueError(f"LaTeX file not found: {tex_file_path}")
 
-        try:
-            logger.info(f"Compiling LaTeX file: {tex_file_path}")
-
-            # Get the directory containing the .tex file
-            work_dir = tex_file_path.parent
-
-            # Run pdflatex twice to resolve references
-            # First pass
-            result = subprocess.run(
-                [
-                    "pdflatex",
-                    "-interaction=nonstopmode",  # Don't stop on errors
-                    "-output-directory", str(work_dir),
-                    str(tex_file_path.name)
-                ],
-                cwd=work_dir,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout
+        return engine
+
+    @staticmethod
+    def _preflight_latex(tex_content: str) -> None:
+        """
+        Cheap structural checks run before spawning the LaTeX engine.
+
+        Catches obviously broken documents (missing preamble or document
+        body, unbalanced environments in the body) without paying for a TeX
+        run. Comments and verbatim text are ignored.
+
+        Args:
+            tex_content: The LaTeX source
+
+        Raises:
+            ValueError: If the document is structurally invalid
+        """
+        # Verbatim text first, since it may contain % or \end{...} literally
+        tex_content = VERBATIM_PATTERN.sub("", tex_content)
+        tex_content = COMMENT_PATTERN.sub(r"\1", tex_content)
+
+        problems = []
+        if "\\documentclass" not in tex_content:
+            problems.append("missing \\documentclass")
+
+        document_begins = tex_content.count("\\begin{document}")
+        document_ends = tex_content.count("\\end{document}")
+        body_start = tex_content.find("\\begin{document}")
+        body_end = tex_content.find("\\end{document}")
+        if document_begins != 1 or document_ends != 1 or body_end < body_start:
+            problems.append("expected exactly one document environment")
+        else:
+            # Only the body is walked: the preamble may legitimately hold
+            # unbalanced \begin / \end inside macro definitions
+            body = tex_content[body_start + len("\\begin{document}"):body_end]
+            problems.extend(PDFCompilerService._check_environment_balance(body))
+
+        if problems:
+            details = "; ".join(problems)
+            logger.error(f"LaTeX pre-flight check failed: {details}")
+            raise ValueError(
+                f"PDF compilation failed due to LaTeX errors in the generated document: {details}"
             )
 
-            if result.returncode != 0:
-                logger.error(f"pdflatex first pass failed: {result.stderr}")
-                # Don't raise immediately, as pdflatex might still produce a PDF
-
-            # Second pass to resolve references
-            result = subprocess.run(
-                [
-                    "pdflatex",
-                    "-interaction=nonstopmode",
-                    "-output-directory", str(work_dir),
-                    str(tex_file_path.name)
-                ],
-                cwd=work_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
+    @staticmethod
+    def _check_environment_balance(body: str) -> list[str]:
+        """
+        Checks that \\begin / \\end pairs in the document body are balanced.
+
+        Args:
+            body: The document body, with comments and verbatim text removed
+
+        Returns:
+            list[str]: Problems found (empty if balanced)
+        """
+        open_environments: list[str] = []
+        for kind, name in ENVIRONMENT_PATTERN.findall(body):
+            if kind == "begin":
+                open_environments.append(name)
+            elif not open_environments:
+                return [f"\\end{{{name}}} without matching \\begin"]
+            elif open_environments[-1] != name:
+                return [f"\\end{{{name}}} does not match \\begin{{{open_environments[-1]}}}"]
+            else:
+                open_environments.pop()
+
+        if open_environments:
+            return [f"unclosed environment: {open_environments[-1]}"]
+        return []
+
+    @staticmethod
+    def _compile_steps(
+        engine: str, tex_file_path: Path, tex_content: str
+    ) -> list[tuple[list[str], Callable[[subprocess.CompletedProcess], None]]]:
+        """
+        Plans the engine invocations needed to compile a LaTeX file.
+
+        Tectonic handles reruns internally, so it is a single step. pdflatex
+        documents with cross-references need two passes: the first only
+        writes the .aux file, so it runs in draft mode, which skips PDF
+        generation entirely. Everything else compiles in one pass.
+
+        Args:
+            engine: The LaTeX engine name
+            tex_file_path: Path to the .tex file (inside the build directory)
+            tex_content: The LaTeX source
+
+        Returns:
+            list: (command, check_result) pairs, in order. check_result
+            raises ValueError if that step failed.
+        """
+        if engine == "tectonic":
+            return [(
+                PDFCompilerService._tectonic_command(tex_file_path),
+                lambda result: PDFCompilerService._check_tectonic_result(tex_file_path, result),
+            )]
+
+        steps = []
+        if PDFCompilerService._needs_second_pass(tex_content):
+            steps.append((
+                PDFCompilerService._pdflatex_command(tex_file_path, draft=True),
+                lambda result: PDFCompilerService._check_pdflatex_result(tex_file_path, result, final=False),
+            ))
+
+        # Final pass produces the PDF
+        steps.append((
+            PDFCompilerService._pdflatex_command(tex_file_path),
+            lambda result: PDFCompilerService._check_pdflatex_result(tex_file_path, result, final=True),
+        ))
+        return steps
+
+    @staticmethod
+    async def _arun(command: list[str], cwd: str) -> subprocess.CompletedProcess:
+        """
+        Runs a command with asyncio, killing it if it exceeds the timeout.
+
+        Args:
+            command: The command and its arguments
+            cwd: Working directory for the command
+
+        Returns:
+            subprocess.CompletedProcess: Result of the command (text output)
+
+        Raises:
+            asyncio.TimeoutError: If the command takes longer than the timeout
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=COMPILE_TIMEOUT_SECONDS
             )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
 
-            # Check if PDF was generated
-            pdf_path = tex_file_path.with_suffix(".pdf")
-            if not pdf_path.exists():
-                logger.error(f"PDF generation failed. pdflatex output: {result.stderr}")
-                raise ValueError(
-                    f"PDF compilation failed. pdflatex did not produce a PDF file. "
-                    f"This might be due to LaTeX syntax errors in the generated document."
-                )
+        return subprocess.CompletedProcess(
+            command,
+            process.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+        )
 
-            # Clean up auxiliary files
-            PDFCompilerService._cleanup_aux_files(tex_file_path)
+    @staticmethod
+    def _needs_second_pass(tex_content: str) -> bool:
+        """
+        Check whether a LaTeX document uses cross-references.
 
-            logger.info(f"Successfully compiled PDF: {pdf_path}")
-            return pdf_path
+        Generated cover letters and resumes normally have none, so they can
+        skip the extra pdflatex pass.
 
-        except subprocess.TimeoutExpired:
-            logger.error("pdflatex compilation timed out")
-            raise ValueError("PDF compilation timed out after 60 seconds")
+        Args:
+            tex_content: The LaTeX source
 
-        except Exception as e:
-            logger.error(f"Error compiling LaTeX to PDF: {str(e)}")
-            raise ValueError(f"Failed to compile PDF: {str(e)}")
+        Returns:
+            bool: True if the document needs a second pdflatex pass
+        """
+        return any(marker in tex_content for marker in CROSS_REFERENCE_MARKERS)
 
     @staticmethod
-    def _cleanup_aux_files(tex_file_path: Path) -> None:
+    def _tectonic_command(tex_file_path: Path) -> list[str]:
         """
-        Clean up auxiliary files created by pdflatex.
+        Builds the tectonic command line for a LaTeX file.
 
         Args:
             tex_file_path: Path to the .tex file
+
+        Returns:
+            list[str]: The tectonic command and its arguments
         """
-        # List of extensions to remove
-        aux_extensions = [".aux", ".log", ".out", ".toc", ".lof", ".lot"]
-
-        base_path = tex_file_path.with_suffix("")
-        for ext in aux_extensions:
-            aux_file = base_path.with_suffix(ext)
-            if aux_file.exists():
-                try:
-                    aux_file.unlink()
-                    logger.debug(f"Removed auxiliary file: {aux_file}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove auxiliary file {aux_file}: {e}")
+        return [
+            "tectonic",
+            "-X", "compile",  # V2 CLI; reruns until references settle
+            "--untrusted",  # Disable shell escape and other insecure features
+            "--outdir", str(tex_file_path.parent),
+            str(tex_file_path.name),
+        ]
+
+    @staticmethod
+    def _check_tectonic_result(
+        tex_file_path: Path, result: subprocess.CompletedProcess
+    ) -> None:
+        """
+        Checks that tectonic produced a PDF.
+
+        Tectonic's error messages go to stderr rather than a .log file.
+
+        Args:
+            tex_file_path: Path to the .tex file
+            result: Result of the tectonic invocation
+
+        Raises:
+            ValueError: If compilation failed
+        """
+        if result.returncode == 0 and tex_file_path.with_suffix(".pdf").exists():
+            return
+
+        errors = [
+            line for line in result.stderr.splitlines()
+            if line.startswith("error:")
+        ]
+        details = "\n".join(errors[:10]) or "no error details reported by tectonic"
+        logger.error(f"tectonic compilation failed: {details}")
+        raise ValueError(
+            f"PDF compilation failed due to LaTeX errors in the generated document: {details}"
+        )
+
+    @staticmethod
+    def _pdflatex_command(tex_file_path: Path, draft: bool = False) -> list[str]:
+        """
+        Builds the command line for a single pdflatex pass.
+
+        Uses batch mode (no terminal output) and halts on the first error
+        instead of trying to recover, so broken documents fail fast.
+
+        Args:
+            tex_file_path: Path to the .tex file
+            draft: If True, run in draft mode (writes .aux but no PDF)
+
+        Returns:
+            list[str]: The pdflatex command and its arguments
+        """
+        command = [
+            "pdflatex",
+            "-interaction=batchmode",  # No terminal output; errors go to the .log
+            "-halt-on-error",  # Stop at the first error
+            "-file-line-error",  # Report errors as file:line:message
+            "-no-shell-escape",  # Never run \write18 shell commands
+        ]
+        if draft:
+            command.append("-draftmode")  # Skip PDF output on non-final passes
+        command += ["-output-directory", str(tex_file_path.parent), str(tex_file_path.name)]
+        return command
+
+    @staticmethod
+    def _check_pdflatex_result(
+        tex_file_path: Path, result: subprocess.CompletedProcess, final: bool
+    ) -> None:
+        """
+        Checks that a pdflatex pass succeeded (and produced a PDF, if final).
+
+        Args:
+            tex_file_path: Path to the .tex file
+            result: Result of the pdflatex invocation
+            final: Whether this was the pass that should produce the PDF
+
+        Raises:
+            ValueError: If the pass failed
+        """
+        if not final:
+            if result.returncode != 0:
+                errors = PDFCompilerService._extract_log_errors(tex_file_path)
+                logger.error(f"pdflatex first pass failed: {errors}")
+                raise ValueError(
+                    f"PDF compilation failed due to LaTeX errors in the generated document: {errors}"
+                )
+            return
+
+        # Check if PDF was generated
+        if result.returncode != 0 or not tex_file_path.with_suffix(".pdf").exists():
+            errors = PDFCompilerService._extract_log_errors(tex_file_path)
+            logger.error(f"PDF generation failed. pdflatex errors: {errors}")
+            raise ValueError(
+                f"PDF compilation failed. pdflatex did not produce a PDF file. "
+                f"This might be due to LaTeX syntax errors in the generated document: {errors}"
+            )
+
+    @staticmethod
+    def _extract_log_errors(tex_file_path: Path, max_lines: int = 10) -> str:
+        """
+        Extract error lines from the pdflatex log file.
+
+        In batch mode pdflatex writes nothing useful to stdout, so errors
+        have to be read from the .log file.
+
+        Args:
+            tex_file_path: Path to the .tex file
+            max_lines: Maximum number of error lines to return
+
+        Returns:
+            str: The error lines, or a generic message if none were found
+        """
+        log_path = tex_file_path.with_suffix(".log")
+        try:
+            log_lines = log_path.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return "pdflatex log file not available"
+
+        error_prefix = f"{tex_file_path.name}:"
+        errors = [
+            line for line in log_lines
+            if line.startswith("!") or error_prefix in line
+        ]
+        return "\n".join(errors[:max_lines]) or "no error details found in pdflatex log"
@@ -1,43 +1,82 @@
-"""PDF parsing service using PyMuPDF4LLMLoader"""
-from langchain_pymupdf4llm import PyMuPDF4LLMLoader, PyMuPDF4LLMParser
+"""PDF parsing service using PyMuPDF"""
 from pathlib import Path
+from backend.config import settings
 import logging
+import pymupdf
+import pymupdf4llm
 
 logger = logging.getLogger(__name__)
 
+# Supported values for settings.pdf_parser_mode
+PDF_PARSER_MODES = ("text", "markdown")
+
 
 class PDFParserService:
-    """Service for parsing PDF resumes using PyMuPDF4LLMLoader"""
+    """Service for parsing PDF resumes using PyMuPDF or PyMuPDF4LLM"""
 
     @staticmethod
     def load_pdf(pdf_path: Path) -> str:
         """
-        Loads PDF using PyMuPDF4LLMLoader which preserves document layout
-        and context for LLM processing.
+        Loads the text of a PDF as a single string.
+
+        See load_pdf_pages for how text is extracted.
 
         Args:
             pdf_path: Path to PDF file
 
         Returns:
-            Extracted text with preserved layout/context
+            Extracted text, with pages separated by blank lines
 
         Raises:
             ValueError: If PDF cannot be parsed
         """
-        try:
-            logger.info(f"Loading PDF from: {pdf_path}")
+        return "\n\n".join(PDFParserService.load_pdf_pages(pdf_path))
 
-            # PyMuPDF4LLMLoader preserves layout, images context
-            loader = PyMuPDF4LLMLoader(str(pdf_path))
-            documents = loader.load()
+    @staticmethod
+    def load_pdf_pages(pdf_path: Path) -> list[str]:
+        """
+        Loads the text of a PDF, one string per page.
+
+        In "text" mode (settings.pdf_parser_mode, the default) PyMuPDF's plain
+        text extraction is used, which is much faster and is all Gemini needs
+        for most resumes. In "markdown" mode pymupdf4llm converts pages to
+        Markdown, preserving layout for resumes with complex structure; header
+        levels are identified once for the whole document so pages are
+        formatted consistently.
+
+        Args:
+            pdf_path: Path to PDF file
+
+        Returns:
+            list[str]: Extracted text for each page, in order
+
+        Raises:
+            ValueError: If PDF cannot be parsed
+        """
+        mode = settings.pdf_parser_mode.lower()
+        if mode not in PDF_PARSER_MODES:
+            raise ValueError(
+                f"Invalid pdf_parser_mode '{settings.pdf_parser_mode}'. "
+                f"Expected one of: {', '.join(PDF_PARSER_MODES)}"
+            )
+
+        try:
+            logger.info(f"Loading PDF pages from: {pdf_path} ({mode} mode)")
 
-            # Combine all pages
-            full_text = "\n\n".join([doc.page_content for doc in documents])
+            with pymupdf.open(str(pdf_path)) as doc:
+                if mode == "markdown":
+                    headers = pymupdf4llm.IdentifyHeaders(doc)
+                    page_chunks = pymupdf4llm.to_markdown(
+                        doc, hdr_info=headers, margins=0, page_chunks=True
+                    )
+                    pages = [chunk["text"] for chunk in page_chunks]
+                else:
+                    pages = [page.get_text("text") for page in doc]
 
-            logger.info(f"Successfully loaded PDF with {len(documents)} pages")
-            logger.debug(f"Extracted text length: {len(full_text)} characters")
+            logger.info(f"Successfully loaded PDF with {len(pages)} pages")
+            logger.debug(f"Extracted text length: {sum(len(page) for page in pages)} characters")
 
-            return full_text
+            return pages
 
         except Exception as e:
             logger.error(f"Error loading PDF: {str(e)}")
@@ -0,0 +1,83 @@
+"""Utilities for merging partial resume parses"""
+from collections import deque
+from backend.models.resume import ResumeData
+
+# ResumeData list fields that are concatenated when merging partial parses
+RESUME_LIST_FIELDS = (
+    "education",
+    "experience",
+    "projects",
+    "skills",
+    "certifications",
+    "publications",
+    "awards",
+    "languages",
+    "volunteer_experience",
+)
+
+
+def merge_sections(target: dict, source: dict) -> None:
+    """
+    Deep-merges source into target in place, without recursion.
+
+    Nested dicts are merged key by key and lists are concatenated. For any
+    other value, the existing value in target wins unless it is empty.
+    Uses an explicit worklist, so arbitrarily deep structures cannot hit
+    the recursion limit.
+
+    Args:
+        target: Dict to merge into (modified in place)
+        source: Dict to merge from
+    """
+    worklist = deque([(target, source)])
+
+    while worklist:
+        current_target, current_source = worklist.popleft()
+
+        for key, value in current_source.items():
+            existing = current_target.get(key)
+
+            if isinstance(existing, dict) and isinstance(value, dict):
+                worklist.append((existing, value))
+            elif isinstance(existing, list) and isinstance(value, list):
+                existing.extend(value)
+            elif existing in (None, "", [], {}):
+                current_target[key] = value
+
+
+def merge_resume(parts: list[ResumeData]) -> ResumeData:
+    """
+    Merges partial ResumeData objects parsed from consecutive chunks.
+
+    List sections are concatenated in chunk order, single-valued fields take
+    the first non-empty value, and additional_sections are deep-merged.
+    Runs in a single pass over the parts.
+
+    Args:
+        parts: Partial parses, in chunk order
+
+    Returns:
+        ResumeData: The merged resume data
+
+    Raises:
+        ValueError: If parts is empty
+    """
+    if not parts:
+        raise ValueError("No resume parts to merge")
+
+    merged = parts[0].model_copy(deep=True)
+
+    for part in parts[1:]:
+        for field_name, value in part.contact_info:
+            if not getattr(merged.contact_info, field_name):
+                setattr(merged.contact_info, field_name, value)
+
+        if not merged.summary:
+            merged.summary = part.summary
+
+        for field_name in RESUME_LIST_FIELDS:
+            getattr(merged, field_name).extend(getattr(part, field_name))
+
+        merge_sections(merged.additional_sections, part.additional_sections)
+
+    return merged
@@ -1,17 +1,31 @@
 """Workspace directory management utilities"""
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from backend.config import settings
 import logging
+import os
 import re
 
 logger = logging.getLogger(__name__)
 
+# Sentinel file in each job folder holding the fingerprint of the captured posting
+JOB_FINGERPRINT_FILE = ".fp"
 
+# Slug patterns, compiled once at import
+SLUG_INVALID_CHARS = re.compile(r'[^\w\s-]')
+SLUG_SEPARATORS = re.compile(r'[-\s]+')
+
+
+@lru_cache(maxsize=None)
 def ensure_workspace_exists() -> Path:
     """
     Ensures workspace directory exists and returns its path.
     Creates directory if it doesn't exist.
 
+    The result is cached, so the directory is only created once per
+    process rather than on every path lookup.
+
     Returns:
         Path: The workspace directory path
 
@@ -21,7 +35,7 @@ def ensure_workspace_exists() -> Path:
     workspace = settings.workspace_path
     try:
         workspace.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Workspace directory: {workspace}")
+        logger.debug(f"Workspace directory: {workspace}")
         return workspace
     except OSError as e:
         logger.error(f"Failed to create workspace directory: {e}")
@@ -38,10 +52,11 @@ def get_resume_path() -> Path:
     return ensure_workspace_exists() / "resume.json"
 
 
+@lru_cache(maxsize=None)
 def get_jobs_dir() -> Path:
     """
     Returns path to jobs directory.
-    Creates it if it doesn't exist.
+    Creates it if it doesn't exist (once per process).
 
     Returns:
         Path: Path to jobs directory in workspace
@@ -51,6 +66,36 @@ def get_jobs_dir() -> Path:
     return jobs_dir
 
 
+@lru_cache(maxsize=None)
+def get_cache_dir() -> Path:
+    """
+    Returns path to the parse cache directory.
+    Creates it if it doesn't exist (once per process).
+
+    Returns:
+        Path: Path to .cache directory in workspace
+    """
+    cache_dir = ensure_workspace_exists() / ".cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_raw_text_path(json_path: Path) -> Path:
+    """
+    Returns path to the raw text sidecar of a saved parse.
+
+    raw_text is kept out of resume.json / job.json and stored next to them
+    (resume.txt / job.txt), so the JSON stays small.
+
+    Args:
+        json_path: Path to the saved JSON file
+
+    Returns:
+        Path: Path to the sidecar .txt file
+    """
+    return json_path.with_suffix(".txt")
+
+
 def sanitize_slug(text: str) -> str:
     """
     Sanitizes text into a filesystem-safe slug.
@@ -62,9 +107,9 @@ def sanitize_slug(text: str) -> str:
         str: Sanitized slug suitable for directory names
     """
     # Remove or replace special characters
-    slug = re.sub(r'[^\w\s-]', '', text)
+    slug = SLUG_INVALID_CHARS.sub('', text)
     # Replace whitespace with hyphens
-    slug = re.sub(r'[-\s]+', '-', slug)
+    slug = SLUG_SEPARATORS.sub('-', slug)
     # Remove leading/trailing hyphens
     slug = slug.strip('-')
     # Limit length to prevent filesystem issues
@@ -88,24 +133,66 @@ def create_job_folder(job_title: str, company: str) -> tuple[Path, str]:
     # Create slug from job_title and company
     job_slug = f"{sanitize_slug(job_title)}-{sanitize_slug(company)}"
 
-    # Handle potential duplicate slugs by appending counter
+    # Handle potential duplicate slugs by appending counter.
+    # Existing names are listed once instead of probing each candidate.
     jobs_dir = get_jobs_dir()
-    job_folder = jobs_dir / job_slug
+    with os.scandir(jobs_dir) as entries:
+        existing_slugs = {entry.name for entry in entries}
 
     counter = 1
     original_slug = job_slug
-    while job_folder.exists():
+    while True:
+        if job_slug not in existing_slugs:
+            job_folder = jobs_dir / job_slug
+            try:
+                # exist_ok=False so a folder created concurrently is not reused
+                job_folder.mkdir()
+                logger.info(f"Created job folder: {job_folder}")
+                return job_folder, job_slug
+            except FileExistsError:
+                pass
+            except OSError as e:
+                logger.error(f"Failed to create job folder: {e}")
+                raise
+
         job_slug = f"{original_slug}-{counter}"
-        job_folder = jobs_dir / job_slug
         counter += 1
 
-    try:
-        job_folder.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Created job folder: {job_folder}")
-        return job_folder, job_slug
-    except OSError as e:
-        logger.error(f"Failed to create job folder: {e}")
-        raise
+
+def find_job_by_fingerprint(fingerprint: str) -> Optional[str]:
+    """
+    Finds an existing job folder whose posting fingerprint matches.
+
+    Args:
+        fingerprint: Fingerprint of the job posting (see write_job_fingerprint)
+
+    Returns:
+        Optional[str]: The matching job_slug, or None if no folder matches
+    """
+    with os.scandir(get_jobs_dir()) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+
+            fingerprint_path = Path(entry.path) / JOB_FINGERPRINT_FILE
+            try:
+                if fingerprint_path.read_text(encoding="utf-8").strip() == fingerprint:
+                    return entry.name
+            except OSError:
+                continue
+
+    return None
+
+
+def write_job_fingerprint(job_folder: Path, fingerprint: str) -> None:
+    """
+    Records the posting fingerprint in a job folder.
+
+    Args:
+        job_folder: Path to the job folder
+        fingerprint: Fingerprint of the job posting
+    """
+    (job_folder / JOB_FINGERPRINT_FILE).write_text(fingerprint, encoding="utf-8")
 
 
 def get_job_json_path(job_slug: str) -> Path: